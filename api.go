@@ -2,11 +2,14 @@ package main
 
 import (
 	"container/heap"
+	"container/list"
 	"context"
 	"encoding/json"
 	"fmt"
+	"math/bits"
 	"net/http"
 	"net/url"
+	"slices"
 	"strings"
 	"sync"
 	"sync/atomic"
@@ -48,14 +51,43 @@ var apiWikiAPIs = map[string]string{
 	"uk": "https://uk.wikipedia.org/w/api.php",
 }
 
-// Глобальный HTTP клиент с прогретыми соединениями
+// Сколько раз дозапрашивать продолжение (plcontinue/lhcontinue/llcontinue):
+// лимит max делится на все страницы батча, без продолжений большая часть
+// ссылок теряется, а хабы на тысячи ссылок не стоят больше 4 запросов
+const apiMaxContinue = 3
+
+// Постоянные параметры запросов fetch, кодируются один раз при старте
+var (
+	apiForwardQuery = url.Values{
+		"action":      {"query"},
+		"format":      {"json"},
+		"prop":        {"links|langlinks"},
+		"pllimit":     {"max"},
+		"lllimit":     {"max"},
+		"plnamespace": {"0"},
+		"redirects":   {"1"},
+	}.Encode()
+	apiBackwardQuery = url.Values{
+		"action":      {"query"},
+		"format":      {"json"},
+		"prop":        {"linkshere|langlinks"},
+		"lhlimit":     {"max"},
+		"lllimit":     {"max"},
+		"lhnamespace": {"0"},
+		"redirects":   {"1"},
+	}.Encode()
+)
+
+// Глобальный HTTP клиент с прогретыми соединениями. Число соединений на
+// хост ограничено: без лимита под нагрузкой сервер исчерпывает эфемерные
+// порты и начинает деградировать
 var globalHTTPClient *http.Client
 
 func initGlobalClient() {
 	tr := &http.Transport{
-		MaxIdleConns:        1000,
-		MaxIdleConnsPerHost: 200,
-		MaxConnsPerHost:     0,
+		MaxIdleConns:        256,
+		MaxIdleConnsPerHost: 32,
+		MaxConnsPerHost:     32,
 		IdleConnTimeout:     90 * time.Second,
 		DisableCompression:  false,
 		ForceAttemptHTTP2:   true,
@@ -64,6 +96,99 @@ func initGlobalClient() {
 	globalHTTPClient = &http.Client{Transport: tr, Timeout: 800 * time.Millisecond}
 }
 
+// apiVegasLimiter - адаптивный лимит параллельных запросов к одному хосту в духе
+// TCP Vegas: пока задержка близка к минимальной, лимит растёт, а когда
+// запросы начинают копиться в очереди сервера (или падать) - снижается.
+// Минимальная задержка берётся по текущему и прошлому окну, а не за всё
+// время жизни сервера: один случайно быстрый ответ не держит лимит внизу
+type apiVegasLimiter struct {
+	mu       sync.Mutex
+	limit    int
+	inFlight int
+	minRTT   time.Duration // минимум прошлого окна
+	winRTT   time.Duration // минимум текущего окна
+	winStart time.Time
+	wake     chan struct{} // закрывается при каждом освобождении слота
+}
+
+const (
+	apiVegasInitLimit = 16
+	apiVegasMinLimit  = 2
+	apiVegasMaxLimit  = 64
+	apiVegasAlpha     = 3 // оценка очереди ниже alpha - лимит растёт
+	apiVegasBeta      = 6 // выше beta - лимит уменьшается
+	apiVegasRTTWindow = 30 * time.Second
+	// Задержку меряем только у полных батчей: у запроса на пару названий
+	// она меньше из-за размера ответа, а не из-за пустой очереди сервера
+	apiVegasSampleTitles = 50
+)
+
+func newAPIVegasLimiter() *apiVegasLimiter {
+	return &apiVegasLimiter{limit: apiVegasInitLimit, wake: make(chan struct{})}
+}
+
+// acquire ждёт свободный слот, false - если ctx отменили раньше
+func (l *apiVegasLimiter) acquire(ctx context.Context) bool {
+	for {
+		l.mu.Lock()
+		if l.inFlight < l.limit {
+			l.inFlight++
+			l.mu.Unlock()
+			return true
+		}
+		wake := l.wake
+		l.mu.Unlock()
+
+		select {
+		case <-wake:
+		case <-ctx.Done():
+			return false
+		}
+	}
+}
+
+// release освобождает слот. rtt - время до ответа (0 - замера нет),
+// failed - запрос упал по таймауту или хост сигналит о перегрузке
+func (l *apiVegasLimiter) release(rtt time.Duration, failed bool) {
+	l.mu.Lock()
+	defer l.mu.Unlock()
+
+	l.inFlight--
+	switch {
+	case failed:
+		l.limit = max(apiVegasMinLimit, l.limit/2)
+	case rtt > 0:
+		if now := time.Now(); now.Sub(l.winStart) > apiVegasRTTWindow {
+			l.minRTT, l.winRTT, l.winStart = l.winRTT, 0, now
+		}
+		if l.winRTT == 0 || rtt < l.winRTT {
+			l.winRTT = rtt
+		}
+		base := l.winRTT
+		if l.minRTT > 0 && l.minRTT < base {
+			base = l.minRTT
+		}
+		queue := float64(l.limit) * (1 - float64(base)/float64(rtt))
+		if queue < apiVegasAlpha {
+			l.limit = min(apiVegasMaxLimit, l.limit+1)
+		} else if queue > apiVegasBeta {
+			l.limit = max(apiVegasMinLimit, l.limit-1)
+		}
+	}
+
+	close(l.wake)
+	l.wake = make(chan struct{})
+}
+
+// Лимитеры по языкам (у каждого языка свой хост), общие для всех поисков
+var apiHostLimiters = func() map[string]*apiVegasLimiter {
+	m := make(map[string]*apiVegasLimiter, len(apiWikiAPIs))
+	for lang := range apiWikiAPIs {
+		m[lang] = newAPIVegasLimiter()
+	}
+	return m
+}()
+
 // SearchRequest - запрос на поиск пути
 type SearchRequest struct {
 	From string `json:"from" example:"Кошка" validate:"required"`
@@ -121,10 +246,127 @@ type APIWikiNode struct {
 	Lang     string
 	Priority int
 	Index    int
+	key      apiNodeKey // заполняется один раз в newAPINode
+}
+
+// apiNodeKey - ключ узла в таблице узлов: сравнимая структура хешируется
+// рантаймом напрямую, без склейки и аллокации строки "lang:title"
+type apiNodeKey struct {
+	lang  string
+	title string // в нижнем регистре
+}
+
+// apiNodeTable - все увиденные узлы в виде struct-of-arrays: ключ один раз
+// интернируется в int32-id, а название, язык и родитель по каждому
+// направлению лежат в плоских срезах по этому id, так что запись о
+// посещении - один int32 в parent.
+//
+// Отдельного множества посещённых нет: посещён с направления d - это
+// parent[d][id] != apiNoNode
+type apiNodeTable struct {
+	mu     sync.Mutex
+	ids    map[apiNodeKey]int32
+	titles []string
+	langs  []string
+	parent [2][]int32 // [apiDirF/apiDirB][id] -> id родителя, apiNoNode или apiRootNode
+}
+
+// Индексы направлений в apiNodeTable.parent
+const (
+	apiDirF = iota
+	apiDirB
+)
+
+const (
+	apiNoNode   int32 = -1 // узел не достигнут с этой стороны
+	apiRootNode int32 = -2 // start для apiDirF, end для apiDirB
+)
+
+// apiPageLink - ссылка страницы; ключ считается до захвата блокировки таблицы
+type apiPageLink struct {
+	title string
+	key   apiNodeKey
+}
+
+func newAPINodeTable() *apiNodeTable {
+	const initCap = 1 << 14
+	t := &apiNodeTable{
+		ids:    make(map[apiNodeKey]int32, initCap),
+		titles: make([]string, 0, initCap),
+		langs:  make([]string, 0, initCap),
+	}
+	for d := range t.parent {
+		t.parent[d] = make([]int32, 0, initCap)
+	}
+	return t
+}
+
+// intern возвращает id узла, заводя новый при первой встрече. Вызывается под t.mu
+func (t *apiNodeTable) intern(key apiNodeKey, title string) int32 {
+	if id, ok := t.ids[key]; ok {
+		return id
+	}
+	id := int32(len(t.titles))
+	t.ids[key] = id
+	t.titles = append(t.titles, title)
+	t.langs = append(t.langs, key.lang)
+	t.parent[apiDirF] = append(t.parent[apiDirF], apiNoNode)
+	t.parent[apiDirB] = append(t.parent[apiDirB], apiNoNode)
+	return id
+}
+
+// root отмечает узел корнем направления d
+func (t *apiNodeTable) root(n *APIWikiNode, d int) {
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	t.parent[d][t.intern(n.Key(), n.Title)] = apiRootNode
+}
+
+// visit под одной блокировкой отмечает ссылки страницы parent посещёнными
+// в направлении d. Впервые увиденные с этой стороны ссылки дописываются в
+// fresh (без приоритета); meet != apiNoNode - ссылка, уже достигнутая с другой
+// стороны. Вставка и проверка встречной стороны атомарны, так что узел,
+// одновременно добавляемый с обеих сторон, не теряется
+func (t *apiNodeTable) visit(parent *APIWikiNode, d int, links []apiPageLink, fresh []*APIWikiNode) ([]*APIWikiNode, int32) {
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	pid := t.intern(parent.Key(), parent.Title)
+	for _, l := range links {
+		id := t.intern(l.key, l.title)
+		if t.parent[d][id] != apiNoNode {
+			continue
+		}
+		t.parent[d][id] = pid
+		if t.parent[1-d][id] != apiNoNode {
+			return fresh, id
+		}
+		fresh = append(fresh, &APIWikiNode{Title: l.title, Lang: l.key.lang, key: l.key})
+	}
+	return fresh, apiNoNode
+}
+
+// chain - узлы от id до корня направления d (включительно)
+func (t *apiNodeTable) chain(id int32, d int) []APIWikiNode {
+	var nodes []APIWikiNode
+	for ; id >= 0; id = t.parent[d][id] {
+		nodes = append(nodes, *newAPINode(t.titles[id], t.langs[id]))
+	}
+	return nodes
 }
 
 func (n APIWikiNode) String() string { return n.Lang + ":" + n.Title }
-func (n APIWikiNode) Key() string    { return strings.ToLower(n.Lang + ":" + n.Title) }
+func (n APIWikiNode) Key() apiNodeKey {
+	if n.key.lang != "" {
+		return n.key
+	}
+	return apiNodeKey{n.Lang, strings.ToLower(n.Title)}
+}
+
+// newAPINode создаёт узел и сразу считает ключ, чтобы title.ToLower()
+// выполнялся один раз на ссылку, а не в каждом Key() и heuristic()
+func newAPINode(title, lang string) *APIWikiNode {
+	return &APIWikiNode{Title: title, Lang: lang, key: apiNodeKey{lang, strings.ToLower(title)}}
+}
 
 type APIPriorityQueue []*APIWikiNode
 
@@ -151,44 +393,158 @@ func (pq *APIPriorityQueue) Pop() interface{} {
 	return item
 }
 
+// APILangLink декодируется тегами напрямую: собственный UnmarshalJSON через
+// map[string]interface{} разбирал каждую interwiki-ссылку дважды
 type APILangLink struct {
-	Lang  string
-	Title string
+	Lang  string `json:"lang"`
+	Title string `json:"*"`
 }
 
-func (l *APILangLink) UnmarshalJSON(data []byte) error {
-	var raw map[string]interface{}
-	if err := json.Unmarshal(data, &raw); err != nil {
-		return err
-	}
-	if lang, ok := raw["lang"].(string); ok {
-		l.Lang = lang
-	}
-	if title, ok := raw["*"].(string); ok {
-		l.Title = title
+type APIWikiPage struct {
+	Title     string                   `json:"title"`
+	Links     []struct{ Title string } `json:"links"`
+	LinksHere []struct{ Title string } `json:"linkshere"`
+	LangLinks []APILangLink            `json:"langlinks"`
+}
+
+// degree - число ссылок страницы в направлении dir, включая interwiki
+func (p APIWikiPage) degree(dir string) int {
+	if dir == "F" {
+		return len(p.Links) + len(p.LangLinks)
 	}
-	return nil
+	return len(p.LinksHere) + len(p.LangLinks)
 }
 
 type APIWikiResponse struct {
-	Query struct {
-		Pages map[string]struct {
-			Title     string                   `json:"title"`
-			Links     []struct{ Title string } `json:"links"`
-			LinksHere []struct{ Title string } `json:"linkshere"`
-			LangLinks []APILangLink            `json:"langlinks"`
-		} `json:"pages"`
+	Error    json.RawMessage   `json:"error"` // maxlag, ratelimited и т.п. приходят с кодом 200
+	Continue map[string]string `json:"continue"`
+	Query    struct {
+		Pages map[string]APIWikiPage `json:"pages"`
 	} `json:"query"`
 }
 
+// ============== Кэш ответов Wikipedia ==============
+
+// apiLRU - потокобезопасный LRU-кэш, общий для всех поисков сервера:
+// хабы и популярные статьи не запрашиваются повторно при каждом поиске.
+// У каждой записи свой срок жизни: сервер работает долго, а статьи меняются
+type apiLRU[K comparable, V any] struct {
+	mu       sync.Mutex
+	capacity int
+	ll       *list.List
+	items    map[K]*list.Element
+}
+
+type apiLRUEntry[K comparable, V any] struct {
+	key     K
+	value   V
+	expires time.Time
+}
+
+func newAPILRU[K comparable, V any](capacity int) *apiLRU[K, V] {
+	return &apiLRU[K, V]{
+		capacity: capacity,
+		ll:       list.New(),
+		items:    make(map[K]*list.Element, capacity),
+	}
+}
+
+func (c *apiLRU[K, V]) Get(key K) (V, bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if el := c.live(key); el != nil {
+		c.ll.MoveToFront(el)
+		return el.Value.(*apiLRUEntry[K, V]).value, true
+	}
+	var zero V
+	return zero, false
+}
+
+// Peek читает значение, не поднимая его в начало очереди вытеснения
+func (c *apiLRU[K, V]) Peek(key K) (V, bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if el := c.live(key); el != nil {
+		return el.Value.(*apiLRUEntry[K, V]).value, true
+	}
+	var zero V
+	return zero, false
+}
+
+// live возвращает неистёкшую запись, истёкшую - удаляет. Вызывается под c.mu
+func (c *apiLRU[K, V]) live(key K) *list.Element {
+	el, ok := c.items[key]
+	if !ok {
+		return nil
+	}
+	if time.Now().After(el.Value.(*apiLRUEntry[K, V]).expires) {
+		c.ll.Remove(el)
+		delete(c.items, key)
+		return nil
+	}
+	return el
+}
+
+func (c *apiLRU[K, V]) Add(key K, value V, ttl time.Duration) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	expires := time.Now().Add(ttl)
+	if el, ok := c.items[key]; ok {
+		entry := el.Value.(*apiLRUEntry[K, V])
+		entry.value, entry.expires = value, expires
+		c.ll.MoveToFront(el)
+		return
+	}
+	c.items[key] = c.ll.PushFront(&apiLRUEntry[K, V]{key, value, expires})
+	if c.ll.Len() > c.capacity {
+		oldest := c.ll.Back()
+		c.ll.Remove(oldest)
+		delete(c.items, oldest.Value.(*apiLRUEntry[K, V]).key)
+	}
+}
+
+// apiPageKey - страница в кэше: язык, направление ("F"/"B") и название
+// в нижнем регистре (links и linkshere - разные ответы)
+type apiPageKey struct {
+	lang  string
+	dir   string
+	title string
+}
+
+// apiTitleKey - результат detectLang для названия в конкретном языке
+type apiTitleKey struct {
+	lang  string
+	title string
+}
+
+type apiTitleInfo struct {
+	realTitle string
+	found     bool
+}
+
+var (
+	pageCache  = newAPILRU[apiPageKey, APIWikiPage](10000)
+	titleCache = newAPILRU[apiTitleKey, apiTitleInfo](10000)
+)
+
+const (
+	apiPageTTL  = 30 * 24 * time.Hour
+	apiTitleTTL = 30 * 24 * time.Hour
+	// Статью могут создать в любой момент, а отказ мог быть временным
+	apiMissingTTL = 10 * time.Minute
+)
+
 type APISearcher struct {
 	client      *http.Client
-	visitedF    sync.Map
-	visitedB    sync.Map
+	nodes       *apiNodeTable
 	found       atomic.Bool
 	result      []APIWikiNode
 	resultMu    sync.Mutex
 	reqCount    atomic.Int64
+	linksF      atomic.Int64 // суммарная степень загруженных страниц (forward)
+	pagesF      atomic.Int64
+	linksB      atomic.Int64 // суммарная степень загруженных страниц (backward)
+	pagesB      atomic.Int64
 	ctx         context.Context
 	cancel      context.CancelFunc
 	targetLang  string
@@ -216,6 +572,7 @@ func NewAPISearcher(startLang, startTitle, targetLang, targetTitle string) *APIS
 
 	return &APISearcher{
 		client:      globalHTTPClient,
+		nodes:       newAPINodeTable(),
 		ctx:         ctx,
 		cancel:      cancel,
 		startLang:   startLang,
@@ -254,6 +611,10 @@ func (s *APISearcher) detectLang(title string) (string, string) {
 	defer cancel()
 
 	for _, lang := range langs {
+		if info, ok := titleCache.Get(apiTitleKey{lang, title}); ok {
+			results <- result{lang, info.realTitle, info.found}
+			continue
+		}
 		go func(l string) {
 			apiURL := apiWikiAPIs[l]
 			params := url.Values{
@@ -276,26 +637,34 @@ func (s *APISearcher) detectLang(title string) (string, string) {
 				return
 			}
 			defer resp.Body.Close()
+			if resp.StatusCode != http.StatusOK {
+				results <- result{l, "", false}
+				return
+			}
 
 			var data struct {
+				Error json.RawMessage `json:"error"` // maxlag, ratelimited и т.п. приходят с кодом 200
 				Query struct {
 					Pages map[string]struct {
-						Title   string `json:"title"`
-						Missing bool   `json:"missing"`
+						Title   string  `json:"title"`
+						Missing *string `json:"missing"` // в format=json это "", а не bool
 					} `json:"pages"`
 				} `json:"query"`
 			}
-			if json.NewDecoder(resp.Body).Decode(&data) != nil {
+			// Отказ API - не ответ "статьи нет", в кэш его не кладём
+			if json.NewDecoder(resp.Body).Decode(&data) != nil || data.Error != nil || len(data.Query.Pages) == 0 {
 				results <- result{l, "", false}
 				return
 			}
 
 			for id, page := range data.Query.Pages {
-				if id != "-1" && !page.Missing {
+				if id != "-1" && page.Missing == nil {
+					titleCache.Add(apiTitleKey{l, title}, apiTitleInfo{page.Title, true}, apiTitleTTL)
 					results <- result{l, page.Title, true}
 					return
 				}
 			}
+			titleCache.Add(apiTitleKey{l, title}, apiTitleInfo{}, apiMissingTTL)
 			results <- result{l, "", false}
 		}(lang)
 	}
@@ -320,9 +689,8 @@ func (s *APISearcher) detectLang(title string) (string, string) {
 	return "", ""
 }
 
-func (s *APISearcher) heuristic(title, lang, dir string) int {
+func (s *APISearcher) heuristic(title, titleLower, lang, dir string) int {
 	score := 100
-	titleLower := strings.ToLower(title)
 
 	var words map[string]bool
 	var targetLang string
@@ -365,164 +733,230 @@ func (s *APISearcher) heuristic(title, lang, dir string) int {
 	return score
 }
 
-func (s *APISearcher) fetch(titles []string, lang, dir string) []*APIWikiNode {
-	if s.found.Load() || len(titles) == 0 {
-		return nil
+// query запрашивает у API ссылки страниц titles; ответ ложится в pageCache
+func (s *APISearcher) query(titles []string, lang, dir string) []APIWikiPage {
+	// Неизменная часть запроса закодирована заранее, здесь добавляются
+	// только titles и курсоры продолжения
+	base := apiWikiAPIs[lang] + "?" + apiBackwardQuery
+	if dir == "F" {
+		base = apiWikiAPIs[lang] + "?" + apiForwardQuery
 	}
+	base += "&titles=" + url.QueryEscape(strings.Join(titles, "|"))
+	reqURL := base
+
+	var pages map[string]APIWikiPage
+	complete := false
+	lim, ok := apiHostLimiters[lang]
+	if !ok {
+		return nil // язык не из apiWikiAPIs: хоста нет
+	}
+	for i := 0; i <= apiMaxContinue && !s.found.Load(); i++ {
+		req, err := http.NewRequestWithContext(s.ctx, "GET", reqURL, nil)
+		if err != nil {
+			break
+		}
+		req.Header.Set("User-Agent", "WikiRacer/5.0")
 
-	apiURL := apiWikiAPIs[lang]
-	var params url.Values
+		if !lim.acquire(s.ctx) {
+			break
+		}
+		start := time.Now()
+		resp, err := s.client.Do(req)
+		if err != nil {
+			// Отмена поиска - не признак перегрузки хоста
+			lim.release(0, s.ctx.Err() == nil)
+			break
+		}
+		rtt := time.Since(start)
+		s.reqCount.Add(1)
+		if len(titles) < apiVegasSampleTitles {
+			rtt = 0 // слот освобождаем, но лимит по такому замеру не двигаем
+		}
 
-	if dir == "F" {
-		params = url.Values{
-			"action":      {"query"},
-			"format":      {"json"},
-			"prop":        {"links|langlinks"},
-			"titles":      {strings.Join(titles, "|")},
-			"pllimit":     {"max"},
-			"lllimit":     {"max"},
-			"plnamespace": {"0"},
-			"redirects":   {"1"},
+		// Пока ждали ответ, встречу уже нашли - тело не разбираем.
+		// 429 и 5xx - перегрузка хоста: лимит снижается, а ответ с
+		// ошибкой не выдаётся за пустую страницу
+		if s.found.Load() || resp.StatusCode != http.StatusOK {
+			resp.Body.Close()
+			lim.release(rtt, resp.StatusCode == http.StatusTooManyRequests || resp.StatusCode >= 500)
+			break
 		}
-	} else {
-		params = url.Values{
-			"action":      {"query"},
-			"format":      {"json"},
-			"prop":        {"linkshere|langlinks"},
-			"titles":      {strings.Join(titles, "|")},
-			"lhlimit":     {"max"},
-			"lllimit":     {"max"},
-			"lhnamespace": {"0"},
-			"redirects":   {"1"},
+
+		var data APIWikiResponse
+		err = json.NewDecoder(resp.Body).Decode(&data)
+		resp.Body.Close()
+		// Ошибка в теле ответа - та же перегрузка, что и 429: лимит
+		// снижается, а страница остаётся недокачанной и в кэш не попадает
+		lim.release(rtt, data.Error != nil)
+		if err != nil || data.Error != nil {
+			break
 		}
-	}
 
-	req, _ := http.NewRequestWithContext(s.ctx, "GET", apiURL+"?"+params.Encode(), nil)
-	req.Header.Set("User-Agent", "WikiRacer/5.0")
+		if pages == nil {
+			pages = data.Query.Pages
+		} else {
+			for id, page := range data.Query.Pages {
+				prev := pages[id]
+				prev.Title = page.Title
+				prev.Links = append(prev.Links, page.Links...)
+				prev.LinksHere = append(prev.LinksHere, page.LinksHere...)
+				prev.LangLinks = append(prev.LangLinks, page.LangLinks...)
+				pages[id] = prev
+			}
+		}
 
-	resp, err := s.client.Do(req)
-	if err != nil {
-		return nil
+		if len(data.Continue) == 0 {
+			complete = true
+			break
+		}
+		cont := make(url.Values, len(data.Continue))
+		for k, v := range data.Continue {
+			cont.Set(k, v)
+		}
+		reqURL = base + "&" + cont.Encode()
 	}
-	defer resp.Body.Close()
-	s.reqCount.Add(1)
 
-	var data APIWikiResponse
-	if json.NewDecoder(resp.Body).Decode(&data) != nil {
+	// Недокачанные страницы не кэшируем, иначе потерянные ссылки
+	// останутся потерянными и для следующих поисков. Несуществующие
+	// (отрицательный id) живут в кэше недолго, как и в titleCache
+	result := make([]APIWikiPage, 0, len(pages))
+	for id, page := range pages {
+		if complete {
+			ttl := apiPageTTL
+			if strings.HasPrefix(id, "-") {
+				ttl = apiMissingTTL
+			}
+			pageCache.Add(apiPageKey{lang, dir, strings.ToLower(page.Title)}, page, ttl)
+		}
+		result = append(result, page)
+	}
+	return result
+}
+
+func (s *APISearcher) fetch(titles []string, lang, dir string) []*APIWikiNode {
+	if s.found.Load() || len(titles) == 0 {
 		return nil
 	}
 
-	var own, other *sync.Map
-	if dir == "F" {
-		own, other = &s.visitedF, &s.visitedB
-	} else {
-		own, other = &s.visitedB, &s.visitedF
+	// Страницы из кэша обрабатываются сразу, в API уходят только остальные
+	pages := make([]APIWikiPage, 0, len(titles))
+	var missing []string
+	for _, title := range titles {
+		if page, ok := pageCache.Get(apiPageKey{lang, dir, strings.ToLower(title)}); ok {
+			pages = append(pages, page)
+		} else {
+			missing = append(missing, title)
+		}
+	}
+	if len(missing) > 0 {
+		pages = append(pages, s.query(missing, lang, dir)...)
 	}
 
 	var newNodes []*APIWikiNode
+	var degree int64
+	var links []apiPageLink
 
-	for _, page := range data.Query.Pages {
+	for _, page := range pages {
 		if s.found.Load() {
 			return nil
 		}
-		parent := APIWikiNode{Title: page.Title, Lang: lang}
+		parent := newAPINode(page.Title, lang)
 
-		var links []struct{ Title string }
+		// Выбираем правильный источник ссылок
+		apiPageLinks := page.LinksHere
 		if dir == "F" {
-			links = page.Links
-		} else {
-			links = page.LinksHere
+			apiPageLinks = page.Links
 		}
+		degree += int64(page.degree(dir))
 
-		for _, link := range links {
-			child := &APIWikiNode{
-				Title:    link.Title,
-				Lang:     lang,
-				Priority: s.heuristic(link.Title, lang, dir),
-			}
-			key := child.Key()
-
-			if _, exists := other.Load(key); exists {
-				if s.found.CompareAndSwap(false, true) {
-					own.Store(key, &parent)
-					s.resultMu.Lock()
-					s.result = s.buildPath(*child)
-					s.resultMu.Unlock()
-					s.cancel()
-					return nil
-				}
-			}
-
-			if _, loaded := own.LoadOrStore(key, &parent); !loaded {
-				newNodes = append(newNodes, child)
-			}
+		links = links[:0]
+		for _, link := range apiPageLinks {
+			links = append(links, apiPageLink{link.Title, apiNodeKey{lang, strings.ToLower(link.Title)}})
 		}
-
 		for _, ll := range page.LangLinks {
 			if _, ok := apiWikiAPIs[ll.Lang]; !ok || ll.Title == "" {
 				continue
 			}
-			child := &APIWikiNode{
-				Title:    ll.Title,
-				Lang:     ll.Lang,
-				Priority: s.heuristic(ll.Title, ll.Lang, dir),
-			}
-			key := child.Key()
-
-			if _, exists := other.Load(key); exists {
-				if s.found.CompareAndSwap(false, true) {
-					own.Store(key, &parent)
-					s.resultMu.Lock()
-					s.result = s.buildPath(*child)
-					s.resultMu.Unlock()
-					s.cancel()
-					return nil
-				}
-			}
+			links = append(links, apiPageLink{ll.Title, apiNodeKey{ll.Lang, strings.ToLower(ll.Title)}})
+		}
 
-			if _, loaded := own.LoadOrStore(key, &parent); !loaded {
-				newNodes = append(newNodes, child)
-			}
+		var done bool
+		if newNodes, done = s.ingest(parent, dir, links, newNodes); done {
+			return nil
 		}
 	}
 
+	if dir == "F" {
+		s.linksF.Add(degree)
+		s.pagesF.Add(int64(len(pages)))
+	} else {
+		s.linksB.Add(degree)
+		s.pagesB.Add(int64(len(pages)))
+	}
+
 	return newNodes
 }
 
-func (s *APISearcher) buildPath(meet APIWikiNode) []APIWikiNode {
-	var fwd []APIWikiNode
-	curr := meet
-	for {
-		fwd = append([]APIWikiNode{curr}, fwd...)
-		val, ok := s.visitedF.Load(curr.Key())
-		if !ok || val == nil {
-			break
-		}
-		p := val.(*APIWikiNode)
-		if p == nil {
-			break
+// ingest отмечает ссылки страницы parent посещёнными в направлении dir и
+// проверяет встречу. Эвристика считается только для впервые увиденных
+// ссылок, которые дописываются в fresh; done - путь найден
+func (s *APISearcher) ingest(parent *APIWikiNode, dir string, links []apiPageLink, fresh []*APIWikiNode) ([]*APIWikiNode, bool) {
+	d := apiDirB
+	if dir == "F" {
+		d = apiDirF
+	}
+	n := len(fresh)
+	fresh, meet := s.nodes.visit(parent, d, links, fresh)
+	if meet != apiNoNode {
+		if s.found.CompareAndSwap(false, true) {
+			s.resultMu.Lock()
+			s.result = s.buildPath(meet)
+			s.resultMu.Unlock()
+			s.cancel()
 		}
-		curr = *p
+		return nil, true
 	}
 
-	var bwd []APIWikiNode
-	if val, ok := s.visitedB.Load(meet.Key()); ok && val != nil {
-		curr = *val.(*APIWikiNode)
-		for {
-			bwd = append(bwd, curr)
-			val, ok := s.visitedB.Load(curr.Key())
-			if !ok || val == nil {
-				break
-			}
-			p := val.(*APIWikiNode)
-			if p == nil {
-				break
-			}
-			curr = *p
+	for _, child := range fresh[n:] {
+		child.Priority = s.heuristic(child.Title, child.key.title, child.Lang, dir)
+		// Степень страниц, уже загруженных прошлыми поисками, известна из
+		// кэша: хабы раскрываются после страниц с небольшим числом ссылок
+		if page, ok := pageCache.Peek(apiPageKey{child.Lang, dir, child.key.title}); ok {
+			child.Priority += apiDegreePenalty(page.degree(dir))
 		}
 	}
+	return fresh, false
+}
+
+// apiDegreePenalty растёт на 5 с каждым удвоением степени сверх 100 ссылок
+func apiDegreePenalty(degree int) int {
+	return bits.Len(uint(degree/100)) * 5
+}
+
+// expandCost оценивает стоимость раскрытия n узлов направления dir:
+// n * средняя степень уже загруженных страниц этого направления
+func (s *APISearcher) expandCost(n int, dir string) float64 {
+	links, pages := s.linksF.Load(), s.pagesF.Load()
+	if dir == "B" {
+		links, pages = s.linksB.Load(), s.pagesB.Load()
+	}
+	if pages == 0 {
+		return float64(n)
+	}
+	return float64(n) * float64(links) / float64(pages)
+}
+
+// buildPath собирает путь start -> meet -> end по родителям обоих направлений
+func (s *APISearcher) buildPath(meet int32) []APIWikiNode {
+	s.nodes.mu.Lock()
+	defer s.nodes.mu.Unlock()
 
-	return append(fwd, bwd...)
+	path := s.nodes.chain(meet, apiDirF)
+	slices.Reverse(path)
+	if p := s.nodes.parent[apiDirB][meet]; p >= 0 {
+		path = append(path, s.nodes.chain(p, apiDirB)...)
+	}
+	return path
 }
 
 func (s *APISearcher) Search(start, end, lang string) []APIWikiNode {
@@ -561,13 +995,13 @@ func (s *APISearcher) Search(start, end, lang string) []APIWikiNode {
 		}
 	}
 
-	startNode := &APIWikiNode{Title: startTitle, Lang: startLang, Priority: 0}
-	endNode := &APIWikiNode{Title: endTitle, Lang: endLang, Priority: 0}
+	startNode := newAPINode(startTitle, startLang)
+	endNode := newAPINode(endTitle, endLang)
 
-	s.visitedF.Store(startNode.Key(), (*APIWikiNode)(nil))
-	s.visitedB.Store(endNode.Key(), (*APIWikiNode)(nil))
+	s.nodes.root(startNode, apiDirF)
+	s.nodes.root(endNode, apiDirB)
 
-	if startTitle == endTitle && startLang == endLang {
+	if startNode.Key() == endNode.Key() {
 		return []APIWikiNode{*startNode}
 	}
 
@@ -576,24 +1010,18 @@ func (s *APISearcher) Search(start, end, lang string) []APIWikiNode {
 	heap.Init(pqF)
 	heap.Init(pqB)
 
+	// Каждая горутина пишет в свою переменную, wg0.Wait() их синхронизирует
 	var wg0 sync.WaitGroup
 	var initF, initB []*APIWikiNode
-	var muF0, muB0 sync.Mutex
 
 	wg0.Add(2)
 	go func() {
 		defer wg0.Done()
-		nodes := s.fetch([]string{startTitle}, startLang, "F")
-		muF0.Lock()
-		initF = nodes
-		muF0.Unlock()
+		initF = s.fetch([]string{startTitle}, startLang, "F")
 	}()
 	go func() {
 		defer wg0.Done()
-		nodes := s.fetch([]string{endTitle}, endLang, "B")
-		muB0.Lock()
-		initB = nodes
-		muB0.Unlock()
+		initB = s.fetch([]string{endTitle}, endLang, "B")
 	}()
 	wg0.Wait()
 
@@ -612,85 +1040,113 @@ func (s *APISearcher) Search(start, end, lang string) []APIWikiNode {
 
 	const batchSize = 50
 	const maxPerRound = 250
-
-	for !s.found.Load() && (pqF.Len() > 0 || pqB.Len() > 0) {
-		select {
-		case <-s.ctx.Done():
-			return s.result
-		default:
+	const maxInFlight = maxPerRound / batchSize
+
+	// Вынутые из очереди названия копятся по языкам, пока язык не наберёт
+	// полный батч: иначе смешанный interwiki-фронт дробится на запросы по
+	// 5-6 названий, и каждый занимает слот maxInFlight. Неполный батч
+	// уходит, если его обошли maxSkips раз (узлы редкого языка, пусть и
+	// лучшие по приоритету, не ждут, пока наберётся 50) или очередь
+	// направления опустела; из нескольких таких - батч с лучшим узлом
+	type langBatch struct {
+		titles []string
+		best   int // наименьший (лучший) приоритет среди titles
+		skips  int // сколько батчей этого направления ушло раньше
+	}
+	const maxSkips = 2
+	pending := map[string]map[string]*langBatch{"F": {}, "B": {}}
+	waiting := map[string]int{}
+	queued := func(dir string, pq *APIPriorityQueue) int { return pq.Len() + waiting[dir] }
+	take := func(dir, lang string) (string, []string) {
+		b := pending[dir][lang]
+		delete(pending[dir], lang)
+		waiting[dir] -= len(b.titles)
+		for _, other := range pending[dir] {
+			other.skips++
 		}
-
-		var wg sync.WaitGroup
-		var muF, muB sync.Mutex
-		var nextF, nextB []*APIWikiNode
-
-		byLangF := make(map[string][]string)
-		count := 0
-		for pqF.Len() > 0 && count < maxPerRound {
-			node := heap.Pop(pqF).(*APIWikiNode)
-			byLangF[node.Lang] = append(byLangF[node.Lang], node.Title)
-			count++
+		return lang, b.titles
+	}
+	due := func(dir string, flush bool) string {
+		lang, best := "", 0
+		for l, b := range pending[dir] {
+			if (flush || b.skips >= maxSkips) && (lang == "" || b.best < best) {
+				lang, best = l, b.best
+			}
 		}
-
-		for lang, titles := range byLangF {
-			for i := 0; i < len(titles); i += batchSize {
-				end := i + batchSize
-				if end > len(titles) {
-					end = len(titles)
-				}
-				batch := titles[i:end]
-				wg.Add(1)
-				go func(t []string, l string) {
-					defer wg.Done()
-					nodes := s.fetch(t, l, "F")
-					if len(nodes) > 0 {
-						muF.Lock()
-						nextF = append(nextF, nodes...)
-						muF.Unlock()
-					}
-				}(batch, lang)
+		return lang
+	}
+	nextBatch := func(dir string, pq *APIPriorityQueue) (string, []string) {
+		if lang := due(dir, false); lang != "" {
+			return take(dir, lang)
+		}
+		buckets := pending[dir]
+		for pq.Len() > 0 {
+			node := heap.Pop(pq).(*APIWikiNode)
+			b := buckets[node.Lang]
+			if b == nil {
+				b = &langBatch{best: node.Priority}
+				buckets[node.Lang] = b
+			}
+			b.titles = append(b.titles, node.Title)
+			b.best = min(b.best, node.Priority)
+			waiting[dir]++
+			if len(b.titles) == batchSize {
+				return take(dir, node.Lang)
 			}
 		}
+		return take(dir, due(dir, true))
+	}
 
-		byLangB := make(map[string][]string)
-		count = 0
-		for pqB.Len() > 0 && count < maxPerRound {
-			node := heap.Pop(pqB).(*APIWikiNode)
-			byLangB[node.Lang] = append(byLangB[node.Lang], node.Title)
-			count++
-		}
+	// Конвейер вместо раундов: новый батч уходит, как только завершился
+	// любой из текущих, а не после самого медленного запроса раунда.
+	// Буфер results покрывает maxInFlight, поэтому горутины не
+	// блокируются, даже если Search уже вернулся.
+	type batchResult struct {
+		dir   string
+		nodes []*APIWikiNode
+	}
+	results := make(chan batchResult, maxInFlight)
+	inFlight := 0
 
-		for lang, titles := range byLangB {
-			for i := 0; i < len(titles); i += batchSize {
-				end := i + batchSize
-				if end > len(titles) {
-					end = len(titles)
-				}
-				batch := titles[i:end]
-				wg.Add(1)
-				go func(t []string, l string) {
-					defer wg.Done()
-					nodes := s.fetch(t, l, "B")
-					if len(nodes) > 0 {
-						muB.Lock()
-						nextB = append(nextB, nodes...)
-						muB.Unlock()
-					}
-				}(batch, lang)
+	for !s.found.Load() {
+		for inFlight < maxInFlight {
+			nF, nB := queued("F", pqF), queued("B", pqB)
+			if nF == 0 && nB == 0 {
+				break
+			}
+			// Жадное чередование: раскрываем сторону, чей фронт дешевле
+			// (размер очереди * средняя степень), иначе на хабе одна
+			// сторона растёт экспоненциально
+			dir, pq := "F", pqF
+			if nF == 0 || (nB > 0 && s.expandCost(nB, "B") < s.expandCost(nF, "F")) {
+				dir, pq = "B", pqB
 			}
-		}
 
-		wg.Wait()
+			lang, titles := nextBatch(dir, pq)
+			inFlight++
+			go func(t []string, l, d string) {
+				results <- batchResult{d, s.fetch(t, l, d)}
+			}(titles, lang, dir)
+		}
 
-		if s.found.Load() {
+		if inFlight == 0 {
 			break
 		}
 
-		for _, n := range nextF {
-			heap.Push(pqF, n)
-		}
-		for _, n := range nextB {
-			heap.Push(pqB, n)
+		select {
+		case r := <-results:
+			inFlight--
+			pq := pqF
+			if r.dir == "B" {
+				pq = pqB
+			}
+			for _, n := range r.nodes {
+				heap.Push(pq, n)
+			}
+		case <-s.ctx.Done():
+			s.resultMu.Lock()
+			defer s.resultMu.Unlock()
+			return s.result
 		}
 	}
 
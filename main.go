@@ -3,11 +3,17 @@ package main
 import (
 	"container/heap"
 	"context"
+	"encoding/gob"
 	"encoding/json"
 	"fmt"
+	"math/bits"
 	"net/http"
 	"net/url"
 	"os"
+	"path/filepath"
+	"runtime/debug"
+	"slices"
+	"sort"
 	"strings"
 	"sync"
 	"sync/atomic"
@@ -27,15 +33,161 @@ var wikiAPIs = map[string]string{
 	"uk": "https://uk.wikipedia.org/w/api.php",
 }
 
+// Сколько раз дозапрашивать продолжение (plcontinue/lhcontinue/llcontinue):
+// лимит max делится на все страницы батча, без продолжений большая часть
+// ссылок теряется, а хабы на тысячи ссылок не стоят больше 4 запросов
+const maxContinue = 3
+
+// Постоянные параметры запросов fetch, кодируются один раз при старте
+var (
+	// Forward: исходящие ссылки (куда ссылается статья)
+	forwardQuery = url.Values{
+		"action":      {"query"},
+		"format":      {"json"},
+		"prop":        {"links|langlinks"},
+		"pllimit":     {"max"},
+		"lllimit":     {"max"},
+		"plnamespace": {"0"},
+		"redirects":   {"1"},
+	}.Encode()
+	// Backward: входящие ссылки (кто ссылается НА статью)
+	backwardQuery = url.Values{
+		"action":      {"query"},
+		"format":      {"json"},
+		"prop":        {"linkshere|langlinks"},
+		"lhlimit":     {"max"},
+		"lllimit":     {"max"},
+		"lhnamespace": {"0"},
+		"redirects":   {"1"},
+	}.Encode()
+)
+
 type WikiNode struct {
 	Title    string
 	Lang     string
 	Priority int
 	Index    int
+	key      nodeKey // заполняется один раз в newNode
+}
+
+// nodeKey - ключ узла в таблице узлов: сравнимая структура хешируется
+// рантаймом напрямую, без склейки и аллокации строки "lang:title"
+type nodeKey struct {
+	lang  string
+	title string // в нижнем регистре
+}
+
+// nodeTable - все увиденные узлы в виде struct-of-arrays: ключ один раз
+// интернируется в int32-id, а название, язык и родитель по каждому
+// направлению лежат в плоских срезах по этому id, так что запись о
+// посещении - один int32 в parent.
+//
+// Отдельного множества посещённых нет: посещён с направления d - это
+// parent[d][id] != noNode
+type nodeTable struct {
+	mu     sync.Mutex
+	ids    map[nodeKey]int32
+	titles []string
+	langs  []string
+	parent [2][]int32 // [dirF/dirB][id] -> id родителя, noNode или rootNode
+}
+
+// Индексы направлений в nodeTable.parent
+const (
+	dirF = iota
+	dirB
+)
+
+const (
+	noNode   int32 = -1 // узел не достигнут с этой стороны
+	rootNode int32 = -2 // start для dirF, end для dirB
+)
+
+// pageLink - ссылка страницы; ключ считается до захвата блокировки таблицы
+type pageLink struct {
+	title string
+	key   nodeKey
+}
+
+func newNodeTable() *nodeTable {
+	const initCap = 1 << 14
+	t := &nodeTable{
+		ids:    make(map[nodeKey]int32, initCap),
+		titles: make([]string, 0, initCap),
+		langs:  make([]string, 0, initCap),
+	}
+	for d := range t.parent {
+		t.parent[d] = make([]int32, 0, initCap)
+	}
+	return t
+}
+
+// intern возвращает id узла, заводя новый при первой встрече. Вызывается под t.mu
+func (t *nodeTable) intern(key nodeKey, title string) int32 {
+	if id, ok := t.ids[key]; ok {
+		return id
+	}
+	id := int32(len(t.titles))
+	t.ids[key] = id
+	t.titles = append(t.titles, title)
+	t.langs = append(t.langs, key.lang)
+	t.parent[dirF] = append(t.parent[dirF], noNode)
+	t.parent[dirB] = append(t.parent[dirB], noNode)
+	return id
+}
+
+// root отмечает узел корнем направления d
+func (t *nodeTable) root(n *WikiNode, d int) {
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	t.parent[d][t.intern(n.Key(), n.Title)] = rootNode
+}
+
+// visit под одной блокировкой отмечает ссылки страницы parent посещёнными
+// в направлении d. Впервые увиденные с этой стороны ссылки дописываются в
+// fresh (без приоритета); meet != noNode - ссылка, уже достигнутая с другой
+// стороны. Вставка и проверка встречной стороны атомарны, так что узел,
+// одновременно добавляемый с обеих сторон, не теряется
+func (t *nodeTable) visit(parent *WikiNode, d int, links []pageLink, fresh []*WikiNode) ([]*WikiNode, int32) {
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	pid := t.intern(parent.Key(), parent.Title)
+	for _, l := range links {
+		id := t.intern(l.key, l.title)
+		if t.parent[d][id] != noNode {
+			continue
+		}
+		t.parent[d][id] = pid
+		if t.parent[1-d][id] != noNode {
+			return fresh, id
+		}
+		fresh = append(fresh, &WikiNode{Title: l.title, Lang: l.key.lang, key: l.key})
+	}
+	return fresh, noNode
+}
+
+// chain - узлы от id до корня направления d (включительно)
+func (t *nodeTable) chain(id int32, d int) []WikiNode {
+	var nodes []WikiNode
+	for ; id >= 0; id = t.parent[d][id] {
+		nodes = append(nodes, *newNode(t.titles[id], t.langs[id]))
+	}
+	return nodes
 }
 
 func (n WikiNode) String() string { return n.Lang + ":" + n.Title }
-func (n WikiNode) Key() string    { return strings.ToLower(n.Lang + ":" + n.Title) }
+func (n WikiNode) Key() nodeKey {
+	if n.key.lang != "" {
+		return n.key
+	}
+	return nodeKey{n.Lang, strings.ToLower(n.Title)}
+}
+
+// newNode создаёт узел и сразу считает ключ, чтобы title.ToLower()
+// выполнялся один раз на ссылку, а не в каждом Key() и heuristic()
+func newNode(title, lang string) *WikiNode {
+	return &WikiNode{Title: title, Lang: lang, key: nodeKey{lang, strings.ToLower(title)}}
+}
 
 type PriorityQueue []*WikiNode
 
@@ -62,44 +214,166 @@ func (pq *PriorityQueue) Pop() interface{} {
 	return item
 }
 
+// LangLink декодируется тегами напрямую: собственный UnmarshalJSON через
+// map[string]interface{} разбирал каждую interwiki-ссылку дважды
 type LangLink struct {
+	Lang  string `json:"lang"`
+	Title string `json:"*"`
+}
+
+type WikiPage struct {
+	Title     string                   `json:"title"`
+	Links     []struct{ Title string } `json:"links"`
+	LinksHere []struct{ Title string } `json:"linkshere"`
+	LangLinks []LangLink               `json:"langlinks"`
+}
+
+// degree - число ссылок страницы в направлении dir, включая interwiki
+func (p WikiPage) degree(dir string) int {
+	if dir == "F" {
+		return len(p.Links) + len(p.LangLinks)
+	}
+	return len(p.LinksHere) + len(p.LangLinks)
+}
+
+type WikiResponse struct {
+	Error    json.RawMessage   `json:"error"` // maxlag, ratelimited и т.п. приходят с кодом 200
+	Continue map[string]string `json:"continue"`
+	Query    struct {
+		Pages map[string]WikiPage `json:"pages"`
+	} `json:"query"`
+}
+
+// ============== Файловый кэш страниц ==============
+
+// pageKey - страница в кэше: язык, направление ("F"/"B") и название
+// в нижнем регистре (links и linkshere - разные ответы)
+type pageKey struct {
 	Lang  string
+	Dir   string
 	Title string
 }
 
-func (l *LangLink) UnmarshalJSON(data []byte) error {
-	var raw map[string]interface{}
-	if err := json.Unmarshal(data, &raw); err != nil {
-		return err
+type cachedPage struct {
+	Page    WikiPage
+	Fetched time.Time
+}
+
+// diskCache - ответы API, сохраняемые между запусками CLI: повторные
+// поиски и хабы, через которые проходит большинство путей, не ходят в сеть
+type diskCache struct {
+	mu    sync.Mutex
+	pages map[pageKey]cachedPage
+	dirty bool
+}
+
+const (
+	cacheTTL        = 30 * 24 * time.Hour
+	cacheMaxEntries = 5000
+)
+
+var pageCache = &diskCache{pages: make(map[pageKey]cachedPage)}
+
+// cachePath - ~/.cache/wikiracer/pages.gob (или аналог для ОС)
+func cachePath() string {
+	dir, err := os.UserCacheDir()
+	if err != nil {
+		return ""
+	}
+	return filepath.Join(dir, "wikiracer", "pages.gob")
+}
+
+// load читает кэш, отбрасывая устаревшие страницы; битый или
+// отсутствующий файл - просто пустой кэш
+func (c *diskCache) load(path string) {
+	f, err := os.Open(path)
+	if err != nil {
+		return
 	}
-	if lang, ok := raw["lang"].(string); ok {
-		l.Lang = lang
+	defer f.Close()
+
+	var pages map[pageKey]cachedPage
+	if gob.NewDecoder(f).Decode(&pages) != nil {
+		return
 	}
-	if title, ok := raw["*"].(string); ok {
-		l.Title = title
+	now := time.Now()
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	for k, p := range pages {
+		if now.Sub(p.Fetched) < cacheTTL {
+			c.pages[k] = p
+		}
 	}
-	return nil
 }
 
-type WikiResponse struct {
-	Query struct {
-		Pages map[string]struct {
-			Title     string                   `json:"title"`
-			Links     []struct{ Title string } `json:"links"`
-			LinksHere []struct{ Title string } `json:"linkshere"`
-			LangLinks []LangLink               `json:"langlinks"`
-		} `json:"pages"`
-	} `json:"query"`
+func (c *diskCache) get(k pageKey) (WikiPage, bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	p, ok := c.pages[k]
+	return p.Page, ok
+}
+
+func (c *diskCache) add(k pageKey, page WikiPage) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	c.pages[k] = cachedPage{page, time.Now()}
+	c.dirty = true
+}
+
+// save атомарно (через временный файл) пишет не больше cacheMaxEntries
+// самых свежих страниц
+func (c *diskCache) save(path string) error {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if !c.dirty || path == "" {
+		return nil
+	}
+
+	pages := c.pages
+	if len(pages) > cacheMaxEntries {
+		keys := make([]pageKey, 0, len(pages))
+		for k := range pages {
+			keys = append(keys, k)
+		}
+		sort.Slice(keys, func(i, j int) bool {
+			return pages[keys[i]].Fetched.After(pages[keys[j]].Fetched)
+		})
+		pages = make(map[pageKey]cachedPage, cacheMaxEntries)
+		for _, k := range keys[:cacheMaxEntries] {
+			pages[k] = c.pages[k]
+		}
+	}
+
+	if err := os.MkdirAll(filepath.Dir(path), 0o755); err != nil {
+		return err
+	}
+	tmp, err := os.CreateTemp(filepath.Dir(path), "pages-*.gob")
+	if err != nil {
+		return err
+	}
+	if err := gob.NewEncoder(tmp).Encode(pages); err != nil {
+		tmp.Close()
+		os.Remove(tmp.Name())
+		return err
+	}
+	if err := tmp.Close(); err != nil {
+		os.Remove(tmp.Name())
+		return err
+	}
+	return os.Rename(tmp.Name(), path)
 }
 
 type Searcher struct {
 	client      *http.Client
-	visitedF    sync.Map
-	visitedB    sync.Map
+	nodes       *nodeTable
 	found       atomic.Bool
 	result      []WikiNode
 	resultMu    sync.Mutex
 	reqCount    atomic.Int64
+	linksF      atomic.Int64 // суммарная степень загруженных страниц (forward)
+	pagesF      atomic.Int64
+	linksB      atomic.Int64 // суммарная степень загруженных страниц (backward)
+	pagesB      atomic.Int64
 	ctx         context.Context
 	cancel      context.CancelFunc
 	targetLang  string
@@ -108,17 +382,31 @@ type Searcher struct {
 	targetWords map[string]bool // слова из End (для forward)
 }
 
-func NewSearcher(startLang, startTitle, targetLang, targetTitle string) *Searcher {
-	tr := &http.Transport{
-		MaxIdleConns:        1000,
-		MaxIdleConnsPerHost: 200,
-		MaxConnsPerHost:     0,
-		IdleConnTimeout:     30 * time.Second,
-		DisableCompression:  false,
-		ForceAttemptHTTP2:   true,
-	}
-	http2.ConfigureTransport(tr)
+// Общий HTTP клиент процесса: keep-alive соединения переживают Search,
+// а число соединений на хост ограничено (без лимита долгий поиск
+// исчерпывает эфемерные порты и начинает деградировать)
+var (
+	sharedClient     *http.Client
+	sharedClientOnce sync.Once
+)
+
+func httpClient() *http.Client {
+	sharedClientOnce.Do(func() {
+		tr := &http.Transport{
+			MaxIdleConns:        256,
+			MaxIdleConnsPerHost: 32,
+			MaxConnsPerHost:     32,
+			IdleConnTimeout:     60 * time.Second,
+			DisableCompression:  false,
+			ForceAttemptHTTP2:   true,
+		}
+		http2.ConfigureTransport(tr)
+		sharedClient = &http.Client{Transport: tr, Timeout: 800 * time.Millisecond}
+	})
+	return sharedClient
+}
 
+func NewSearcher(startLang, startTitle, targetLang, targetTitle string) *Searcher {
 	ctx, cancel := context.WithTimeout(context.Background(), 10*time.Second)
 
 	// Слова из Start (для backward эвристики)
@@ -138,7 +426,8 @@ func NewSearcher(startLang, startTitle, targetLang, targetTitle string) *Searche
 	}
 
 	return &Searcher{
-		client:      &http.Client{Transport: tr, Timeout: 800 * time.Millisecond},
+		client:      httpClient(),
+		nodes:       newNodeTable(),
 		ctx:         ctx,
 		cancel:      cancel,
 		startLang:   startLang,
@@ -150,9 +439,8 @@ func NewSearcher(startLang, startTitle, targetLang, targetTitle string) *Searche
 
 // Быстрая эвристика (меньше = лучше)
 // dir="F" -> ищем слова из End, dir="B" -> ищем слова из Start
-func (s *Searcher) heuristic(title, lang, dir string) int {
+func (s *Searcher) heuristic(title, titleLower, lang, dir string) int {
 	score := 100
-	titleLower := strings.ToLower(title)
 
 	// Выбираем целевые слова в зависимости от направления
 	var words map[string]bool
@@ -302,167 +590,214 @@ func (s *Searcher) detectLang(title string) (string, string) {
 	return "", ""
 }
 
-func (s *Searcher) fetch(titles []string, lang, dir string) []*WikiNode {
-	if s.found.Load() || len(titles) == 0 {
-		return nil
+// query запрашивает у API ссылки страниц titles; полностью загруженные
+// страницы ложатся в pageCache
+func (s *Searcher) query(titles []string, lang, dir string) []WikiPage {
+	// Неизменная часть запроса закодирована заранее, здесь добавляются
+	// только titles и курсоры продолжения
+	apiURL, ok := wikiAPIs[lang]
+	if !ok {
+		return nil // язык не из wikiAPIs: хоста нет
 	}
+	base := apiURL + "?" + backwardQuery
+	if dir == "F" {
+		base = apiURL + "?" + forwardQuery
+	}
+	base += "&titles=" + url.QueryEscape(strings.Join(titles, "|"))
+	reqURL := base
+
+	var pages map[string]WikiPage
+	complete := false
+	for i := 0; i <= maxContinue && !s.found.Load(); i++ {
+		req, err := http.NewRequestWithContext(s.ctx, "GET", reqURL, nil)
+		if err != nil {
+			break
+		}
+		req.Header.Set("User-Agent", "WikiRacer/5.0")
 
-	apiURL := wikiAPIs[lang]
-	var params url.Values
+		resp, err := s.client.Do(req)
+		if err != nil {
+			break
+		}
+		s.reqCount.Add(1)
 
-	if dir == "F" {
-		// Forward: исходящие ссылки (куда ссылается статья)
-		params = url.Values{
-			"action":      {"query"},
-			"format":      {"json"},
-			"prop":        {"links|langlinks"},
-			"titles":      {strings.Join(titles, "|")},
-			"pllimit":     {"max"},
-			"lllimit":     {"max"},
-			"plnamespace": {"0"},
-			"redirects":   {"1"},
+		// Пока ждали ответ, встречу уже нашли - тело не разбираем.
+		// Ответ с ошибкой (429, 5xx) не выдаётся за пустую страницу
+		if s.found.Load() || resp.StatusCode != http.StatusOK {
+			resp.Body.Close()
+			break
 		}
-	} else {
-		// Backward: входящие ссылки (кто ссылается НА статью)
-		params = url.Values{
-			"action":      {"query"},
-			"format":      {"json"},
-			"prop":        {"linkshere|langlinks"},
-			"titles":      {strings.Join(titles, "|")},
-			"lhlimit":     {"max"},
-			"lllimit":     {"max"},
-			"lhnamespace": {"0"},
-			"redirects":   {"1"},
+
+		var data WikiResponse
+		err = json.NewDecoder(resp.Body).Decode(&data)
+		resp.Body.Close()
+		// Отказ API посреди продолжения - не конец ссылок: страница
+		// остаётся недокачанной и в кэш не попадает
+		if err != nil || data.Error != nil {
+			break
+		}
+
+		if pages == nil {
+			pages = data.Query.Pages
+		} else {
+			for id, page := range data.Query.Pages {
+				prev := pages[id]
+				prev.Title = page.Title
+				prev.Links = append(prev.Links, page.Links...)
+				prev.LinksHere = append(prev.LinksHere, page.LinksHere...)
+				prev.LangLinks = append(prev.LangLinks, page.LangLinks...)
+				pages[id] = prev
+			}
 		}
-	}
 
-	req, _ := http.NewRequestWithContext(s.ctx, "GET", apiURL+"?"+params.Encode(), nil)
-	req.Header.Set("User-Agent", "WikiRacer/5.0")
+		if len(data.Continue) == 0 {
+			complete = true
+			break
+		}
+		cont := make(url.Values, len(data.Continue))
+		for k, v := range data.Continue {
+			cont.Set(k, v)
+		}
+		reqURL = base + "&" + cont.Encode()
+	}
 
-	resp, err := s.client.Do(req)
-	if err != nil {
-		return nil
+	// Недокачанные страницы не кэшируем, иначе потерянные ссылки
+	// останутся потерянными и для следующих запусков. Несуществующие
+	// (отрицательный id) тоже: статью могут создать в любой момент
+	result := make([]WikiPage, 0, len(pages))
+	for id, page := range pages {
+		if complete && !strings.HasPrefix(id, "-") {
+			pageCache.add(pageKey{lang, dir, strings.ToLower(page.Title)}, page)
+		}
+		result = append(result, page)
 	}
-	defer resp.Body.Close()
-	s.reqCount.Add(1)
+	return result
+}
 
-	var data WikiResponse
-	if json.NewDecoder(resp.Body).Decode(&data) != nil {
+func (s *Searcher) fetch(titles []string, lang, dir string) []*WikiNode {
+	if s.found.Load() || len(titles) == 0 {
 		return nil
 	}
 
-	var own, other *sync.Map
-	if dir == "F" {
-		own, other = &s.visitedF, &s.visitedB
-	} else {
-		own, other = &s.visitedB, &s.visitedF
+	// Страницы из кэша обрабатываются сразу, в API уходят только остальные
+	pages := make([]WikiPage, 0, len(titles))
+	var missing []string
+	for _, title := range titles {
+		if page, ok := pageCache.get(pageKey{lang, dir, strings.ToLower(title)}); ok {
+			pages = append(pages, page)
+		} else {
+			missing = append(missing, title)
+		}
+	}
+	if len(missing) > 0 {
+		pages = append(pages, s.query(missing, lang, dir)...)
 	}
 
 	var newNodes []*WikiNode
+	var degree int64
+	var links []pageLink
 
-	for _, page := range data.Query.Pages {
+	for _, page := range pages {
 		if s.found.Load() {
 			return nil
 		}
-		parent := WikiNode{Title: page.Title, Lang: lang}
+		parent := newNode(page.Title, lang)
 
 		// Выбираем правильный источник ссылок
-		var links []struct{ Title string }
+		pageLinks := page.LinksHere
 		if dir == "F" {
-			links = page.Links
-		} else {
-			links = page.LinksHere
+			pageLinks = page.Links
 		}
+		degree += int64(page.degree(dir))
 
-		for _, link := range links {
-			child := &WikiNode{
-				Title:    link.Title,
-				Lang:     lang,
-				Priority: s.heuristic(link.Title, lang, dir),
-			}
-			key := child.Key()
-
-			if _, exists := other.Load(key); exists {
-				if s.found.CompareAndSwap(false, true) {
-					own.Store(key, &parent)
-					s.resultMu.Lock()
-					s.result = s.buildPath(*child)
-					s.resultMu.Unlock()
-					s.cancel()
-					return nil
-				}
-			}
-
-			if _, loaded := own.LoadOrStore(key, &parent); !loaded {
-				newNodes = append(newNodes, child)
-			}
+		links = links[:0]
+		for _, link := range pageLinks {
+			links = append(links, pageLink{link.Title, nodeKey{lang, strings.ToLower(link.Title)}})
 		}
-
 		for _, ll := range page.LangLinks {
 			if _, ok := wikiAPIs[ll.Lang]; !ok || ll.Title == "" {
 				continue
 			}
-			child := &WikiNode{
-				Title:    ll.Title,
-				Lang:     ll.Lang,
-				Priority: s.heuristic(ll.Title, ll.Lang, dir),
-			}
-			key := child.Key()
-
-			if _, exists := other.Load(key); exists {
-				if s.found.CompareAndSwap(false, true) {
-					own.Store(key, &parent)
-					s.resultMu.Lock()
-					s.result = s.buildPath(*child)
-					s.resultMu.Unlock()
-					s.cancel()
-					return nil
-				}
-			}
+			links = append(links, pageLink{ll.Title, nodeKey{ll.Lang, strings.ToLower(ll.Title)}})
+		}
 
-			if _, loaded := own.LoadOrStore(key, &parent); !loaded {
-				newNodes = append(newNodes, child)
-			}
+		var done bool
+		if newNodes, done = s.ingest(parent, dir, links, newNodes); done {
+			return nil
 		}
 	}
 
+	if dir == "F" {
+		s.linksF.Add(degree)
+		s.pagesF.Add(int64(len(pages)))
+	} else {
+		s.linksB.Add(degree)
+		s.pagesB.Add(int64(len(pages)))
+	}
+
 	return newNodes
 }
 
-func (s *Searcher) buildPath(meet WikiNode) []WikiNode {
-	var fwd []WikiNode
-	curr := meet
-	for {
-		fwd = append([]WikiNode{curr}, fwd...)
-		val, ok := s.visitedF.Load(curr.Key())
-		if !ok || val == nil {
-			break
-		}
-		p := val.(*WikiNode)
-		if p == nil {
-			break
+// ingest отмечает ссылки страницы parent посещёнными в направлении dir и
+// проверяет встречу. Эвристика считается только для впервые увиденных
+// ссылок, которые дописываются в fresh; done - путь найден
+func (s *Searcher) ingest(parent *WikiNode, dir string, links []pageLink, fresh []*WikiNode) ([]*WikiNode, bool) {
+	d := dirB
+	if dir == "F" {
+		d = dirF
+	}
+	n := len(fresh)
+	fresh, meet := s.nodes.visit(parent, d, links, fresh)
+	if meet != noNode {
+		if s.found.CompareAndSwap(false, true) {
+			s.resultMu.Lock()
+			s.result = s.buildPath(meet)
+			s.resultMu.Unlock()
+			s.cancel()
 		}
-		curr = *p
+		return nil, true
 	}
 
-	var bwd []WikiNode
-	if val, ok := s.visitedB.Load(meet.Key()); ok && val != nil {
-		curr = *val.(*WikiNode)
-		for {
-			bwd = append(bwd, curr)
-			val, ok := s.visitedB.Load(curr.Key())
-			if !ok || val == nil {
-				break
-			}
-			p := val.(*WikiNode)
-			if p == nil {
-				break
-			}
-			curr = *p
+	for _, child := range fresh[n:] {
+		child.Priority = s.heuristic(child.Title, child.key.title, child.Lang, dir)
+		// Степень страниц из прошлых запусков известна по кэшу: хабы
+		// раскрываются после страниц с небольшим числом ссылок
+		if page, ok := pageCache.get(pageKey{child.Lang, dir, child.key.title}); ok {
+			child.Priority += degreePenalty(page.degree(dir))
 		}
 	}
+	return fresh, false
+}
+
+// degreePenalty растёт на 5 с каждым удвоением степени сверх 100 ссылок
+func degreePenalty(degree int) int {
+	return bits.Len(uint(degree/100)) * 5
+}
+
+// expandCost оценивает стоимость раскрытия n узлов направления dir:
+// n * средняя степень уже загруженных страниц этого направления
+func (s *Searcher) expandCost(n int, dir string) float64 {
+	links, pages := s.linksF.Load(), s.pagesF.Load()
+	if dir == "B" {
+		links, pages = s.linksB.Load(), s.pagesB.Load()
+	}
+	if pages == 0 {
+		return float64(n)
+	}
+	return float64(n) * float64(links) / float64(pages)
+}
+
+// buildPath собирает путь start -> meet -> end по родителям обоих направлений
+func (s *Searcher) buildPath(meet int32) []WikiNode {
+	s.nodes.mu.Lock()
+	defer s.nodes.mu.Unlock()
 
-	return append(fwd, bwd...)
+	path := s.nodes.chain(meet, dirF)
+	slices.Reverse(path)
+	if p := s.nodes.parent[dirB][meet]; p >= 0 {
+		path = append(path, s.nodes.chain(p, dirB)...)
+	}
+	return path
 }
 
 func (s *Searcher) Search(start, end, lang string) []WikiNode {
@@ -503,13 +838,13 @@ func (s *Searcher) Search(start, end, lang string) []WikiNode {
 		}
 	}
 
-	startNode := &WikiNode{Title: startTitle, Lang: startLang, Priority: 0}
-	endNode := &WikiNode{Title: endTitle, Lang: endLang, Priority: 0}
+	startNode := newNode(startTitle, startLang)
+	endNode := newNode(endTitle, endLang)
 
-	s.visitedF.Store(startNode.Key(), (*WikiNode)(nil))
-	s.visitedB.Store(endNode.Key(), (*WikiNode)(nil))
+	s.nodes.root(startNode, dirF)
+	s.nodes.root(endNode, dirB)
 
-	if startTitle == endTitle && startLang == endLang {
+	if startNode.Key() == endNode.Key() {
 		return []WikiNode{*startNode}
 	}
 
@@ -519,24 +854,18 @@ func (s *Searcher) Search(start, end, lang string) []WikiNode {
 	heap.Init(pqB)
 
 	// Первые запросы параллельно
+	// Каждая горутина пишет в свою переменную, wg0.Wait() их синхронизирует
 	var wg0 sync.WaitGroup
 	var initF, initB []*WikiNode
-	var muF0, muB0 sync.Mutex
 
 	wg0.Add(2)
 	go func() {
 		defer wg0.Done()
-		nodes := s.fetch([]string{startTitle}, startLang, "F")
-		muF0.Lock()
-		initF = nodes
-		muF0.Unlock()
+		initF = s.fetch([]string{startTitle}, startLang, "F")
 	}()
 	go func() {
 		defer wg0.Done()
-		nodes := s.fetch([]string{endTitle}, endLang, "B")
-		muB0.Lock()
-		initB = nodes
-		muB0.Unlock()
+		initB = s.fetch([]string{endTitle}, endLang, "B")
 	}()
 	wg0.Wait()
 
@@ -555,87 +884,113 @@ func (s *Searcher) Search(start, end, lang string) []WikiNode {
 
 	const batchSize = 50
 	const maxPerRound = 250
-
-	for !s.found.Load() && (pqF.Len() > 0 || pqB.Len() > 0) {
-		select {
-		case <-s.ctx.Done():
-			return s.result
-		default:
+	const maxInFlight = maxPerRound / batchSize
+
+	// Вынутые из очереди названия копятся по языкам, пока язык не наберёт
+	// полный батч: иначе смешанный interwiki-фронт дробится на запросы по
+	// 5-6 названий, и каждый занимает слот maxInFlight. Неполный батч
+	// уходит, если его обошли maxSkips раз (узлы редкого языка, пусть и
+	// лучшие по приоритету, не ждут, пока наберётся 50) или очередь
+	// направления опустела; из нескольких таких - батч с лучшим узлом
+	type langBatch struct {
+		titles []string
+		best   int // наименьший (лучший) приоритет среди titles
+		skips  int // сколько батчей этого направления ушло раньше
+	}
+	const maxSkips = 2
+	pending := map[string]map[string]*langBatch{"F": {}, "B": {}}
+	waiting := map[string]int{}
+	queued := func(dir string, pq *PriorityQueue) int { return pq.Len() + waiting[dir] }
+	take := func(dir, lang string) (string, []string) {
+		b := pending[dir][lang]
+		delete(pending[dir], lang)
+		waiting[dir] -= len(b.titles)
+		for _, other := range pending[dir] {
+			other.skips++
 		}
-
-		var wg sync.WaitGroup
-		var muF, muB sync.Mutex
-		var nextF, nextB []*WikiNode
-
-		// Forward
-		byLangF := make(map[string][]string)
-		count := 0
-		for pqF.Len() > 0 && count < maxPerRound {
-			node := heap.Pop(pqF).(*WikiNode)
-			byLangF[node.Lang] = append(byLangF[node.Lang], node.Title)
-			count++
+		return lang, b.titles
+	}
+	due := func(dir string, flush bool) string {
+		lang, best := "", 0
+		for l, b := range pending[dir] {
+			if (flush || b.skips >= maxSkips) && (lang == "" || b.best < best) {
+				lang, best = l, b.best
+			}
 		}
-
-		for lang, titles := range byLangF {
-			for i := 0; i < len(titles); i += batchSize {
-				end := i + batchSize
-				if end > len(titles) {
-					end = len(titles)
-				}
-				batch := titles[i:end]
-				wg.Add(1)
-				go func(t []string, l string) {
-					defer wg.Done()
-					nodes := s.fetch(t, l, "F")
-					if len(nodes) > 0 {
-						muF.Lock()
-						nextF = append(nextF, nodes...)
-						muF.Unlock()
-					}
-				}(batch, lang)
+		return lang
+	}
+	nextBatch := func(dir string, pq *PriorityQueue) (string, []string) {
+		if lang := due(dir, false); lang != "" {
+			return take(dir, lang)
+		}
+		buckets := pending[dir]
+		for pq.Len() > 0 {
+			node := heap.Pop(pq).(*WikiNode)
+			b := buckets[node.Lang]
+			if b == nil {
+				b = &langBatch{best: node.Priority}
+				buckets[node.Lang] = b
+			}
+			b.titles = append(b.titles, node.Title)
+			b.best = min(b.best, node.Priority)
+			waiting[dir]++
+			if len(b.titles) == batchSize {
+				return take(dir, node.Lang)
 			}
 		}
+		return take(dir, due(dir, true))
+	}
 
-		// Backward
-		byLangB := make(map[string][]string)
-		count = 0
-		for pqB.Len() > 0 && count < maxPerRound {
-			node := heap.Pop(pqB).(*WikiNode)
-			byLangB[node.Lang] = append(byLangB[node.Lang], node.Title)
-			count++
-		}
+	// Конвейер вместо раундов: новый батч уходит, как только завершился
+	// любой из текущих, а не после самого медленного запроса раунда.
+	// Буфер results покрывает maxInFlight, поэтому горутины не
+	// блокируются, даже если Search уже вернулся.
+	type batchResult struct {
+		dir   string
+		nodes []*WikiNode
+	}
+	results := make(chan batchResult, maxInFlight)
+	inFlight := 0
 
-		for lang, titles := range byLangB {
-			for i := 0; i < len(titles); i += batchSize {
-				end := i + batchSize
-				if end > len(titles) {
-					end = len(titles)
-				}
-				batch := titles[i:end]
-				wg.Add(1)
-				go func(t []string, l string) {
-					defer wg.Done()
-					nodes := s.fetch(t, l, "B")
-					if len(nodes) > 0 {
-						muB.Lock()
-						nextB = append(nextB, nodes...)
-						muB.Unlock()
-					}
-				}(batch, lang)
+	for !s.found.Load() {
+		for inFlight < maxInFlight {
+			nF, nB := queued("F", pqF), queued("B", pqB)
+			if nF == 0 && nB == 0 {
+				break
+			}
+			// Жадное чередование: раскрываем сторону, чей фронт дешевле
+			// (размер очереди * средняя степень), иначе на хабе одна
+			// сторона растёт экспоненциально
+			dir, pq := "F", pqF
+			if nF == 0 || (nB > 0 && s.expandCost(nB, "B") < s.expandCost(nF, "F")) {
+				dir, pq = "B", pqB
 			}
-		}
 
-		wg.Wait()
+			lang, titles := nextBatch(dir, pq)
+			inFlight++
+			go func(t []string, l, d string) {
+				results <- batchResult{d, s.fetch(t, l, d)}
+			}(titles, lang, dir)
+		}
 
-		if s.found.Load() {
+		if inFlight == 0 {
 			break
 		}
 
-		for _, n := range nextF {
-			heap.Push(pqF, n)
-		}
-		for _, n := range nextB {
-			heap.Push(pqB, n)
+		select {
+		case r := <-results:
+			inFlight--
+			pq := pqF
+			if r.dir == "B" {
+				pq = pqB
+			}
+			for _, n := range r.nodes {
+				heap.Push(pq, n)
+			}
+		case <-s.ctx.Done():
+			s.resultMu.Lock()
+			defer s.resultMu.Unlock()
+			return s.result
 		}
 	}
 
@@ -645,6 +1000,10 @@ func (s *Searcher) Search(start, end, lang string) []WikiNode {
 }
 
 func main() {
+	// CLI живёт несколько секунд и в основном декодирует JSON: реже
+	// запускаем GC ценой памяти, освобождать её всё равно будет ОС
+	debug.SetGCPercent(400)
+
 	start, end, lang := "Ибраево", "Arch Linux", "ru"
 	if len(os.Args) >= 3 {
 		start, end = os.Args[1], os.Args[2]
@@ -654,10 +1013,15 @@ func main() {
 	}
 
 	t0 := time.Now()
+	cacheFile := cachePath()
+	pageCache.load(cacheFile)
 	s := NewSearcher(lang, start, lang, end)
 	path := s.Search(start, end, lang)
 
 	fmt.Printf("\n⏱️ %v | 📊 %d req\n", time.Since(t0), s.reqCount.Load())
+	if err := pageCache.save(cacheFile); err != nil {
+		fmt.Fprintf(os.Stderr, "⚠️ Кэш не сохранён: %v\n", err)
+	}
 
 	if len(path) > 0 {
 		fmt.Printf("🎯 Путь (%d):\n", len(path))
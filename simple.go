@@ -27,6 +27,11 @@ var wikiAPIs = map[string]string{
 	"uk": "https://uk.wikipedia.org/w/api.php",
 }
 
+// Сколько раз дозапрашивать продолжение (plcontinue/lhcontinue/llcontinue):
+// лимит max делится на все страницы батча, без продолжений большая часть
+// ссылок теряется, а хабы на тысячи ссылок не стоят больше 4 запросов
+const maxContinue = 3
+
 type WikiNode struct {
 	Title    string
 	Lang     string
@@ -81,14 +86,17 @@ func (l *LangLink) UnmarshalJSON(data []byte) error {
 	return nil
 }
 
+type WikiPage struct {
+	Title     string                   `json:"title"`
+	Links     []struct{ Title string } `json:"links"`
+	LinksHere []struct{ Title string } `json:"linkshere"`
+	LangLinks []LangLink               `json:"langlinks"`
+}
+
 type WikiResponse struct {
-	Query struct {
-		Pages map[string]struct {
-			Title     string                   `json:"title"`
-			Links     []struct{ Title string } `json:"links"`
-			LinksHere []struct{ Title string } `json:"linkshere"`
-			LangLinks []LangLink               `json:"langlinks"`
-		} `json:"pages"`
+	Continue map[string]string `json:"continue"`
+	Query    struct {
+		Pages map[string]WikiPage `json:"pages"`
 	} `json:"query"`
 }
 
@@ -108,17 +116,31 @@ type Searcher struct {
 	targetWords map[string]bool // слова из End (для forward)
 }
 
-func NewSearcher(startLang, startTitle, targetLang, targetTitle string) *Searcher {
-	tr := &http.Transport{
-		MaxIdleConns:        1000,
-		MaxIdleConnsPerHost: 200,
-		MaxConnsPerHost:     0,
-		IdleConnTimeout:     30 * time.Second,
-		DisableCompression:  false,
-		ForceAttemptHTTP2:   true,
-	}
-	http2.ConfigureTransport(tr)
+// Общий HTTP клиент процесса: keep-alive соединения переживают Search,
+// а число соединений на хост ограничено (без лимита долгий поиск
+// исчерпывает эфемерные порты и начинает деградировать)
+var (
+	sharedClient     *http.Client
+	sharedClientOnce sync.Once
+)
 
+func httpClient() *http.Client {
+	sharedClientOnce.Do(func() {
+		tr := &http.Transport{
+			MaxIdleConns:        256,
+			MaxIdleConnsPerHost: 32,
+			MaxConnsPerHost:     32,
+			IdleConnTimeout:     60 * time.Second,
+			DisableCompression:  false,
+			ForceAttemptHTTP2:   true,
+		}
+		http2.ConfigureTransport(tr)
+		sharedClient = &http.Client{Transport: tr, Timeout: 1500 * time.Millisecond}
+	})
+	return sharedClient
+}
+
+func NewSearcher(startLang, startTitle, targetLang, targetTitle string) *Searcher {
 	ctx, cancel := context.WithTimeout(context.Background(), 5*time.Second)
 
 	// Слова из Start (для backward эвристики)
@@ -138,7 +160,7 @@ func NewSearcher(startLang, startTitle, targetLang, targetTitle string) *Searche
 	}
 
 	return &Searcher{
-		client:      &http.Client{Transport: tr, Timeout: 1500 * time.Millisecond},
+		client:      httpClient(),
 		ctx:         ctx,
 		cancel:      cancel,
 		startLang:   startLang,
@@ -315,19 +337,43 @@ func (s *Searcher) fetch(titles []string, lang, dir string) []*WikiNode {
 		}
 	}
 
-	req, _ := http.NewRequestWithContext(s.ctx, "GET", apiURL+"?"+params.Encode(), nil)
-	req.Header.Set("User-Agent", "WikiRacer/5.0")
+	var pages map[string]WikiPage
+	for i := 0; i <= maxContinue && !s.found.Load(); i++ {
+		req, _ := http.NewRequestWithContext(s.ctx, "GET", apiURL+"?"+params.Encode(), nil)
+		req.Header.Set("User-Agent", "WikiRacer/5.0")
 
-	resp, err := s.client.Do(req)
-	if err != nil {
-		return nil
-	}
-	defer resp.Body.Close()
-	s.reqCount.Add(1)
+		resp, err := s.client.Do(req)
+		if err != nil {
+			break
+		}
+		s.reqCount.Add(1)
 
-	var data WikiResponse
-	if json.NewDecoder(resp.Body).Decode(&data) != nil {
-		return nil
+		var data WikiResponse
+		err = json.NewDecoder(resp.Body).Decode(&data)
+		resp.Body.Close()
+		if err != nil {
+			break
+		}
+
+		if pages == nil {
+			pages = data.Query.Pages
+		} else {
+			for id, page := range data.Query.Pages {
+				prev := pages[id]
+				prev.Title = page.Title
+				prev.Links = append(prev.Links, page.Links...)
+				prev.LinksHere = append(prev.LinksHere, page.LinksHere...)
+				prev.LangLinks = append(prev.LangLinks, page.LangLinks...)
+				pages[id] = prev
+			}
+		}
+
+		if len(data.Continue) == 0 {
+			break
+		}
+		for k, v := range data.Continue {
+			params.Set(k, v)
+		}
 	}
 
 	var own, other *sync.Map
@@ -339,7 +385,7 @@ func (s *Searcher) fetch(titles []string, lang, dir string) []*WikiNode {
 
 	var newNodes []*WikiNode
 
-	for _, page := range data.Query.Pages {
+	for _, page := range pages {
 		if s.found.Load() {
 			return nil
 		}